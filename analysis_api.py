@@ -4,9 +4,11 @@ Synchronous analysis micro-service.
 ─────────────────────────────────────────────
 Responsibilities
 1. Accept a PDF link (found by ordinance_finder) & run analysis immediately.
-2. Expose:
+2. Persist scores of analyses that name a town, for cross-town comparison.
+3. Expose:
    • POST  /api/analyze       -> returns {"job_id": …} (202 Accepted)
    • GET   /api/status/<job_id> -> {"state": PENDING|SUCCESS|FAILURE, "result"/"error": …}
+   • GET   /api/rankings      -> towns ranked by a category / criterion score
 """
 
 import os
@@ -16,6 +18,8 @@ from flask import Blueprint, request, jsonify
 from dotenv import load_dotenv
 from anthropic import Anthropic
 from utils import pdf_parser
+from utils.score_store import ScoreStore, ScoreStoreError, rubric_version
+from utils.admission import AdmissionLimit
 
 load_dotenv()
 anthropic_client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
@@ -28,14 +32,23 @@ def _lazy_json(path: str):
     return _json_cache[path]
 
 JOBS: dict[str, dict] = {}
+score_store = ScoreStore(os.getenv("ZONING_SCORES_PATH", "zoning_scores.db"))
+
+# Each analysis launches a headless Chrome plus several LLM calls
+analyze_admission = AdmissionLimit.from_env(
+    "ANALYZE", "analysis",
+    max_concurrent=2, max_queue=4, queue_timeout=30, rate_per_minute=4, burst=3,
+)
 bp = Blueprint("analysis_api", __name__)
 
 @bp.route("/api/analyze", methods=["POST"])
+@analyze_admission.guard
 def api_analyze():
     """Kicks off a synchronous analysis job."""
     print("\n--- /api/analyze endpoint hit! ---")
     data = request.get_json(silent=True) or {}
     pdf_link = (data.get("link") or "").strip()
+    town = (data.get("city") or "").strip()
     print(f"Received link: {pdf_link if pdf_link else 'None'}")
     if not pdf_link:
         return jsonify({"error": "Missing 'link'"}), 400
@@ -58,6 +71,13 @@ def api_analyze():
 
         print("Analysis successful.")
         JOBS[job_id] = {"state": "SUCCESS", "result": result}
+
+        if town:
+            try:
+                score_store.record(town, result["scores"], best_prac_data,
+                                   ordinance_hash=result.get("ordinance_hash"))
+            except Exception as e:
+                print(f"!!! Could not store scores for {town}: {e}")
     except Exception as e:
         print(f"!!! ANALYSIS FAILED: {e}")
         JOBS[job_id] = {"state": "FAILURE", "error": str(e)}
@@ -72,5 +92,52 @@ def api_status(job_id: str):
         return jsonify({"error": "Unknown job_id"}), 404
     return jsonify(job)
 
+def _float_arg(name: str):
+    value = request.args.get(name)
+    if value in (None, ""):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise ScoreStoreError(f"'{name}' must be a number")
+
+@bp.route("/api/rankings", methods=["GET"])
+def api_rankings():
+    """
+    Rank towns by their latest stored score.
+    ?category=parking_requirements[&criterion=…][&min_score=…][&max_score=…]
+    [&order=desc|asc][&limit=50][&offset=0][&rubric_version=…]
+    Without `category`, returns summary stats for every category.
+    """
+    version = request.args.get("rubric_version") or rubric_version(
+        _lazy_json("config/best_practices.json"))
+    category = (request.args.get("category") or "").strip()
+    if not category:
+        return jsonify({"rubric_version": version,
+                        "categories": score_store.category_stats(version)})
+
+    criterion = (request.args.get("criterion") or "").strip()
+    try:
+        limit = max(1, min(int(request.args.get("limit", 50)), 500))
+        offset = max(int(request.args.get("offset", 0)), 0)
+        towns = score_store.rank(
+            version, category, criterion,
+            min_score=_float_arg("min_score"), max_score=_float_arg("max_score"),
+            order=request.args.get("order", "desc"), limit=limit, offset=offset,
+        )
+    except ValueError:
+        return jsonify({"error": "'limit' and 'offset' must be integers"}), 400
+    except ScoreStoreError as e:
+        return jsonify({"error": str(e)}), 400
+
+    stats = score_store.category_stats(version, category, criterion)
+    return jsonify({
+        "rubric_version": version,
+        "category": category,
+        "criterion": criterion or None,
+        "stats": stats[0] if stats else None,
+        "towns": towns,
+    })
+
 def register_to(app):
     app.register_blueprint(bp)
\ No newline at end of file
@@ -0,0 +1,38 @@
+# benchmarks/bench_extract.py
+"""
+Compare PDF text-extraction throughput between the "layout" and "fast" engines.
+Run with:  python -m benchmarks.bench_extract path/to/ordinance.pdf [more.pdf ...]
+"""
+
+import sys
+import time
+from utils import pdf_parser
+
+
+def bench(path: str, mode: str, repeat: int = 3) -> tuple[int, int, float]:
+    """Best-of-`repeat` wall time; returns (pages, chars, seconds)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pages = pdf_parser.extract_text(path, mode=mode)
+        best = min(best, time.perf_counter() - start)
+    return len(pages), sum(len(p) for p in pages), best
+
+
+def main(paths):
+    if not paths:
+        print(__doc__)
+        return 1
+    print(f"{'file':40} {'mode':7} {'pages':>5} {'chars':>9} {'sec':>7} {'pages/s':>8}")
+    for path in paths:
+        timings = {}
+        for mode in pdf_parser.EXTRACT_MODES:
+            n_pages, n_chars, secs = bench(path, mode)
+            timings[mode] = secs
+            print(f"{path[-40:]:40} {mode:7} {n_pages:5d} {n_chars:9d} {secs:7.2f} {n_pages / secs:8.1f}")
+        print(f"{'':40} speed-up fast vs layout: {timings['layout'] / timings['fast']:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,52 @@
+# benchmarks/bench_ocr.py
+"""
+OCR throughput for a scanned PDF across worker counts, cold and warm cache.
+Needs pytesseract and the tesseract binary.
+Run with:  python -m benchmarks.bench_ocr path/to/scanned.pdf [max_workers]
+"""
+
+import os
+import sys
+import time
+import tempfile
+import pypdfium2 as pdfium
+from utils import ocr
+
+
+def run(path: str, pages: list, cache_dir: str) -> float:
+    start = time.perf_counter()
+    ocr.ocr_pages(path, pages, cache_dir=cache_dir, progress=lambda *a: None)
+    return time.perf_counter() - start
+
+
+def main(args):
+    if not args:
+        print(__doc__)
+        return 1
+    if not ocr.ocr_available():
+        print("OCR unavailable: install pytesseract and tesseract.")
+        return 1
+    path = args[0]
+    max_workers = int(args[1]) if len(args) > 1 else (os.cpu_count() or 1)
+    pdf = pdfium.PdfDocument(path)
+    pages = list(range(len(pdf)))
+    pdf.close()
+
+    print(f"{len(pages)} pages at {ocr.OCR_DPI} dpi")
+    print(f"{'workers':>7} {'cold s':>8} {'pages/s':>8} {'warm s':>8} {'pages/s':>8}")
+    workers = 1
+    while True:
+        ocr.reset_pool(workers=workers)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cold = run(path, pages, cache_dir)
+            warm = run(path, pages, cache_dir)
+        print(f"{workers:7d} {cold:8.2f} {len(pages) / cold:8.2f} {warm:8.2f} {len(pages) / warm:8.2f}")
+        if workers >= max_workers:
+            break
+        workers = min(workers * 2, max_workers)
+    ocr.reset_pool()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -8,13 +8,20 @@ Run with:  python main.py   (or set as your IDE debug target)
 """
 
 import os
-from ordinance_finder import app      # the Flask app constructed there
+from ordinance_finder import app, registry      # the Flask app constructed there
 #   (ordinance_finder already imported and registered analysis_api)
+from utils.ordinance_registry import RegistryRefresher
 
 if __name__ == "__main__":
     host = os.getenv("FLASK_HOST", "0.0.0.0")
     port = int(os.getenv("FLASK_PORT", 8000))
     debug = bool(os.getenv("FLASK_DEBUG", "1") == "1")
 
+    # Re-check stale registry entries in the background. With the debug
+    # reloader only the child process (WERKZEUG_RUN_MAIN) should run it.
+    if not debug or os.getenv("WERKZEUG_RUN_MAIN") == "true":
+        interval = float(os.getenv("ZONING_REGISTRY_REFRESH_SECONDS", 3600))
+        RegistryRefresher(registry, interval=interval).start()
+
     print(f"Starting Flask on http://{host}:{port}  (debug={debug})")
     app.run(host=host, port=port, debug=debug)
@@ -1,11 +1,16 @@
 import os
 import json
 import re
+import time
+import secrets
+import threading
 from typing import Dict, Optional
 from flask import Flask, request, jsonify, render_template
 from anthropic import Anthropic
 from dotenv import load_dotenv
 from analysis_api import register_to
+from utils.ordinance_registry import OrdinanceRegistry, RegistryError
+from utils.admission import AdmissionLimit, AdmissionRejected
 
 # Load environment variables
 load_dotenv()
@@ -16,6 +21,53 @@ register_to(app)
 # Initialize Anthropic client
 client = Anthropic(api_key=os.getenv('ANTHROPIC_API_KEY'))
 
+# Confirmed city -> ordinance links, consulted before any web search
+registry = OrdinanceRegistry(os.getenv('ZONING_REGISTRY_PATH', 'ordinance_registry.db'))
+
+# Caps concurrent web-search calls and per-client search rate (registry hits are not limited)
+zoning_admission = AdmissionLimit.from_env(
+    'ZONING', 'zoning lookup',
+    max_concurrent=4, max_queue=8, queue_timeout=15, rate_per_minute=10, burst=5,
+)
+
+# Confirm / reject are cheap but write to the shared registry
+feedback_admission = AdmissionLimit.from_env(
+    'FEEDBACK', 'feedback',
+    max_concurrent=8, max_queue=16, queue_timeout=5, rate_per_minute=20, burst=10,
+)
+
+# Results handed out by /api/zoning, keyed by the feedback token sent with them.
+# Confirm / reject act on these server-side copies, never on client-supplied links.
+FEEDBACK_TOKEN_TTL = 3600
+FEEDBACK_TOKEN_LIMIT = 10000
+_issued_results: Dict[str, tuple] = {}          # token -> (expires_at, query, result)
+_issued_lock = threading.Lock()
+
+def issue_feedback_token(query: str, result: Dict) -> str:
+    """Remember a result we served so a later confirm/reject can refer to it."""
+    token = secrets.token_urlsafe(16)
+    now = time.time()
+    with _issued_lock:
+        if len(_issued_results) >= FEEDBACK_TOKEN_LIMIT:
+            for key in [k for k, (exp, _, _) in _issued_results.items() if exp <= now]:
+                del _issued_results[key]
+            while len(_issued_results) >= FEEDBACK_TOKEN_LIMIT:     # drop oldest
+                del _issued_results[next(iter(_issued_results))]
+        _issued_results[token] = (now + FEEDBACK_TOKEN_TTL, query, dict(result))
+    return token
+
+def redeem_feedback_token(token: Optional[str]) -> Optional[tuple]:
+    """(query, result) for a live token, else None. Tokens stay valid until they expire."""
+    with _issued_lock:
+        issued = _issued_results.get(token or '')
+        if issued is None:
+            return None
+        expires_at, query, result = issued
+        if expires_at <= time.time():
+            del _issued_results[token]
+            return None
+    return query, result
+
 def parse_zoning_response(response_text: str) -> Dict:
     """Parse the Claude response to extract zoning ordinance information."""
     # Look for the zoning_ordinance tags
@@ -110,18 +162,68 @@ def api_zoning():
         if not city_name:
             return jsonify({'error': 'City name cannot be empty'}), 400
         
+        # Answer from the local registry of confirmed ordinances when possible
+        try:
+            cached = registry.lookup(city_name)
+        except Exception as e:
+            print(f"Registry lookup failed, falling back to web search: {e}")
+            cached = None
+        if cached:
+            cached['source'] = 'registry'
+            cached['feedback_token'] = issue_feedback_token(city_name, cached)
+            return jsonify(cached)
+
         # Get zoning ordinance information using web search
-        result = get_zoning_ordinance(city_name)
+        with zoning_admission.admit(request.remote_addr):
+            result = get_zoning_ordinance(city_name)
         
         # Validate that we got the required fields
         if not result.get('city') or not result.get('link'):
             return jsonify({'error': 'Could not find zoning ordinance information'}), 404
         
+        result['source'] = 'search'
+        result['feedback_token'] = issue_feedback_token(city_name, result)
         return jsonify(result)
         
+    except AdmissionRejected as e:
+        return e.to_response()
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _issued_result_or_error():
+    """Resolve the request's feedback_token to ((query, result), None) or (None, error response)."""
+    data = request.get_json(silent=True) or {}
+    if not data.get('feedback_token'):
+        return None, (jsonify({'error': 'feedback_token is required'}), 400)
+    issued = redeem_feedback_token(data['feedback_token'])
+    if issued is None:
+        return None, (jsonify({'error': 'Unknown or expired feedback_token; search again'}), 403)
+    return issued, None
+
+@app.route('/api/zoning/confirm', methods=['POST'])
+@feedback_admission.guard
+def api_zoning_confirm():
+    """Record a result we served as user-confirmed in the registry."""
+    issued, error = _issued_result_or_error()
+    if error:
+        return error
+    query, result = issued
+    try:
+        entry = registry.confirm(result, query=query)
+    except RegistryError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(entry)
+
+@app.route('/api/zoning/reject', methods=['POST'])
+@feedback_admission.guard
+def api_zoning_reject():
+    """Drop a result we served from the registry (every alias pointing at its link)."""
+    issued, error = _issued_result_or_error()
+    if error:
+        return error
+    _, result = issued
+    return jsonify({'removed': registry.reject(result['city'], link=result['link'])})
+
 @app.route('/health')
 def health_check():
     """Health check endpoint."""
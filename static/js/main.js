@@ -171,8 +171,7 @@ class ZoningApp {
             In the future, this will be analyzed against zoning best practices.</p>
         `;
         
-        // TODO: Send verification to backend
-        console.log('Document confirmed:', this.currentResult);
+        this.sendFeedback('/api/zoning/confirm');
     }
     
     rejectDocument() {
@@ -188,8 +187,23 @@ class ZoningApp {
             </button>
         `;
         
-        // TODO: Send rejection to backend for learning
-        console.log('Document rejected:', this.currentResult);
+        this.sendFeedback('/api/zoning/reject');
+    }
+    
+    async sendFeedback(url) {
+        if (!this.currentResult) return;
+        
+        try {
+            await fetch(url, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({ feedback_token: this.currentResult.feedback_token })
+            });
+        } catch (error) {
+            console.error('Failed to record feedback:', error);
+        }
     }
     
     searchAgain() {
@@ -0,0 +1,66 @@
+# tests/conftest.py
+# shared fixtures: test PDFs, a small scoring rubric, admission-quota resets.
+
+import pytest
+
+def _write_pdf(path, pages):
+    """
+    Minimal PDF. Each page is a list of Helvetica text lines, or a raw content
+    stream string (e.g. filled rectangles, to stand in for a scanned page).
+    """
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in pages:
+        ops = page if isinstance(page, str) else "".join(
+            f"BT /F1 12 Tf 72 {720 - 20 * i} Td ({line}) Tj ET\n" for i, line in enumerate(page))
+        objects.append(f"<< /Length {len(ops)} >>\nstream\n{ops}endstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out, offsets = b"%PDF-1.4\n", []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{num} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    path.write_bytes(out)
+
+@pytest.fixture
+def write_pdf():
+    """Builds small real PDFs for extraction tests: write_pdf(path, pages)."""
+    return _write_pdf
+
+SMALL_RUBRIC = {
+    "zoning_best_practices_framework": {
+        "metadata": {"version": "1.0"},
+        "evaluation_categories": {
+            "parking_requirements": {
+                "weight": 50,
+                "criteria": {"residential_parking_minimums": {}, "parking_maximums": {}},
+            },
+            "mixed_use_flexibility": {
+                "weight": 50,
+                "criteria": {"mixed_use_zoning": {}},
+            },
+        },
+    }
+}
+
+@pytest.fixture
+def best_practices():
+    """A two-category rubric (version "1.0") small enough to reason about in tests."""
+    return SMALL_RUBRIC
+
+@pytest.fixture
+def reset_admission_quotas():
+    """Route tests start with full per-client quotas on the limited endpoints."""
+    import analysis_api
+    import ordinance_finder
+    ordinance_finder.zoning_admission.reset()
+    ordinance_finder.feedback_admission.reset()
+    analysis_api.analyze_admission.reset()
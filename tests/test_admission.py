@@ -0,0 +1,136 @@
+# tests/test_admission.py
+# tests logic in utils/admission.py and the limits on /api/zoning and /api/analyze.
+
+import threading
+import pytest
+from unittest.mock import patch
+
+import analysis_api
+import ordinance_finder
+from ordinance_finder import app
+from utils.admission import (
+    AdmissionLimit, AdmissionRejected, ConcurrencyLimiter, TokenBucketQuota,
+)
+
+pytestmark = pytest.mark.usefixtures("reset_admission_quotas")
+
+@pytest.fixture
+def client():
+    with app.test_client() as client:
+        yield client
+
+# -----------------
+# ## 1. ConcurrencyLimiter / TokenBucketQuota
+# -----------------
+
+def test_limiter_sheds_when_queue_is_full():
+    limiter = ConcurrencyLimiter(max_concurrent=1, max_queue=0, queue_timeout=5)
+    limiter.acquire()
+    with pytest.raises(AdmissionRejected) as exc:
+        limiter.acquire()
+    assert exc.value.status == 503
+    assert exc.value.retry_after >= 1
+    limiter.release(0.1)
+    limiter.acquire()       # slot is free again
+
+def test_limiter_queue_times_out():
+    limiter = ConcurrencyLimiter(max_concurrent=1, max_queue=1, queue_timeout=0.05)
+    limiter.acquire()
+    with pytest.raises(AdmissionRejected):
+        limiter.acquire()
+    assert limiter.waiting == 0
+
+def test_limiter_queued_request_gets_released_slot():
+    limiter = ConcurrencyLimiter(max_concurrent=1, max_queue=1, queue_timeout=5)
+    limiter.acquire()
+    admitted = threading.Event()
+    waiter = threading.Thread(target=lambda: (limiter.acquire(), admitted.set()))
+    waiter.start()
+    assert not admitted.wait(0.05)
+    limiter.release(0.1)
+    waiter.join(timeout=5)
+    assert admitted.is_set() and limiter.active == 1
+
+def test_token_bucket_refills_over_time():
+    now = [0.0]
+    quota = TokenBucketQuota(rate_per_minute=60, burst=2, clock=lambda: now[0])
+    assert quota.take("a") == 0 and quota.take("a") == 0
+    assert quota.take("a") == pytest.approx(1.0)
+    assert quota.take("b") == 0                     # buckets are per client
+    now[0] += 1.0
+    assert quota.take("a") == 0
+
+def test_shed_request_does_not_spend_quota():
+    limit = AdmissionLimit("test", max_concurrent=1, max_queue=0, queue_timeout=5,
+                           rate_per_minute=1, burst=2)
+    limit.slots.acquire()                           # saturate the endpoint
+    for _ in range(3):
+        with pytest.raises(AdmissionRejected) as exc:
+            with limit.admit("a"):
+                pass
+        assert exc.value.status == 503
+    limit.slots.release(0.1)
+    with limit.admit("a"):                          # quota is still full
+        pass
+    with limit.admit("a"):
+        pass
+
+def test_token_bucket_disabled_with_zero_rate():
+    quota = TokenBucketQuota(rate_per_minute=0, burst=0)
+    assert all(quota.take("a") == 0 for _ in range(100))
+
+# -----------------
+# ## 2. Endpoints
+# -----------------
+
+@patch('ordinance_finder.get_zoning_ordinance')
+def test_api_zoning_over_quota_gets_429(mock_get_ordinance, client, monkeypatch):
+    mock_get_ordinance.return_value = {'city': 'Springfield', 'link': 'http://s.gov/z.pdf'}
+    monkeypatch.setattr(ordinance_finder.zoning_admission, "quota",
+                        TokenBucketQuota(rate_per_minute=1, burst=1))
+
+    assert client.post('/api/zoning', json={'city': 'Springfield'}).status_code == 200
+    response = client.post('/api/zoning', json={'city': 'Springfield'})
+
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+    assert mock_get_ordinance.call_count == 1
+
+@patch('ordinance_finder.get_zoning_ordinance')
+def test_api_zoning_saturated_gets_503(mock_get_ordinance, client, monkeypatch):
+    limiter = ConcurrencyLimiter(max_concurrent=1, max_queue=0, queue_timeout=1)
+    monkeypatch.setattr(ordinance_finder.zoning_admission, "slots", limiter)
+    limiter.acquire()       # another search is in flight
+
+    response = client.post('/api/zoning', json={'city': 'Springfield'})
+
+    assert response.status_code == 503
+    assert 'Retry-After' in response.headers
+    mock_get_ordinance.assert_not_called()
+
+def test_api_analyze_saturated_gets_503(client, monkeypatch):
+    limiter = ConcurrencyLimiter(max_concurrent=1, max_queue=0, queue_timeout=1)
+    monkeypatch.setattr(analysis_api.analyze_admission, "slots", limiter)
+    limiter.acquire()
+
+    response = client.post('/api/analyze', json={'link': 'http://x/z.pdf'})
+
+    assert response.status_code == 503
+    assert int(response.headers['Retry-After']) >= 1
+
+def test_api_analyze_over_quota_gets_429(client, monkeypatch):
+    monkeypatch.setattr(analysis_api.analyze_admission, "quota",
+                        TokenBucketQuota(rate_per_minute=1, burst=1))
+    # Missing link -> 400, but it still spends the client's token
+    assert client.post('/api/analyze', json={}).status_code == 400
+    response = client.post('/api/analyze', json={})
+    assert response.status_code == 429
+    assert response.get_json()['retry_after'] >= 1
+
+def test_api_zoning_feedback_over_quota_gets_429(client, monkeypatch):
+    monkeypatch.setattr(ordinance_finder.feedback_admission, "quota",
+                        TokenBucketQuota(rate_per_minute=1, burst=1))
+    assert client.post('/api/zoning/confirm', json={}).status_code == 400
+    response = client.post('/api/zoning/reject', json={})
+    assert response.status_code == 429
+    assert 'Retry-After' in response.headers
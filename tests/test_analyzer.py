@@ -59,7 +59,7 @@ def test_analyze_pdf_happy_path(monkeypatch, tmp_path):
     dummy_pdf = tmp_path / "dummy.pdf"
     dummy_pdf.write_bytes(b"%PDF-1.4\n%EOF")
     monkeypatch.setattr(pdf_parser, "download_pdf", lambda url: str(dummy_pdf))
-    monkeypatch.setattr(pdf_parser, "extract_text", lambda path: ["p1", "p2"])
+    monkeypatch.setattr(pdf_parser, "extract_text", lambda path, **kw: ["p1", "p2"])
     monkeypatch.setattr(pdf_parser, "chunk_text", lambda pages: ["c1", "c2", "c3"])
     monkeypatch.setattr(pdf_parser, "summarize_chunks", lambda chunks, client: "THE SUMMARY")
     monkeypatch.setattr(pdf_parser, "score_document", lambda summary, bp, w, client: {"foo": 1, "total": 1})
@@ -83,7 +83,13 @@ def test_analyze_pdf_happy_path(monkeypatch, tmp_path):
         best_practices_data=dummy_best_practices_data, # Use new argument
     )
 
-    assert result == {"summary": "THE SUMMARY", "scores": {"foo": 1, "total": 1}}
+    assert result == {
+        "summary": "THE SUMMARY",
+        "scores": {"foo": 1, "total": 1},
+        "ordinance_hash": pdf_parser.file_sha256(str(dummy_pdf)),
+        "page_count": 2,
+        "ocr_pages": 0,
+    }
     assert removed["called"]
 
 def test_analyze_pdf_download_error(monkeypatch):
@@ -106,7 +112,7 @@ def test_analyze_pdf_extract_error(monkeypatch, tmp_path):
     dummy_pdf.write_bytes(b"%PDF-1.4\n%EOF")
     monkeypatch.setattr(pdf_parser, "download_pdf", lambda url: str(dummy_pdf))
     monkeypatch.setattr(pdf_parser, "extract_text",
-                        lambda path: (_ for _ in ()).throw(PDFAnalysisError("no text")))
+                        lambda path, **kw: (_ for _ in ()).throw(PDFAnalysisError("no text")))
     
     removed = {"called": False}
     monkeypatch.setattr(os, "remove", lambda p: removed.update({"called": True}))
@@ -119,4 +125,66 @@ def test_analyze_pdf_extract_error(monkeypatch, tmp_path):
     with pytest.raises(PDFAnalysisError):
          # Pass the minimal data instead of an empty dictionary
         pdf_parser.analyze_pdf("http://example.com/fake.pdf", DummyClient(), dummy_best_practices_data)
-    assert removed["called"]
\ No newline at end of file
+    assert removed["called"]
+
+# --- extract_text engine tests ---
+def test_looks_garbled_heuristic():
+    assert pdf_parser._looks_garbled("")
+    assert pdf_parser._looks_garbled("(cid:12)(cid:40)(cid:7) " * 5)
+    assert pdf_parser._looks_garbled("\x01\x02\x03\x04\x05\x06\x07\x08" * 5)
+    assert not pdf_parser._looks_garbled("Section 5.2 Dimensional requirements for the R-1 district.")
+
+def test_extract_text_fast_falls_back_per_page(monkeypatch):
+    good = "Section 1. Purpose. This bylaw regulates the use of land."
+    monkeypatch.setattr(pdf_parser, "_fast_page_texts", lambda path: [good, "", "(cid:3)(cid:4)"])
+    requested = []
+    def fake_layout(path, indices=None):
+        requested.append(list(indices))
+        return {i: f"LAYOUT{i}" for i in indices}
+    monkeypatch.setattr(pdf_parser, "_layout_page_texts", fake_layout)
+
+    pages = pdf_parser.extract_text("x.pdf", mode="fast")
+
+    assert pages == [good, "LAYOUT1", "LAYOUT2"]
+    assert requested == [[1, 2]]
+
+def test_extract_text_layout_mode_skips_fast_path(monkeypatch):
+    monkeypatch.setattr(pdf_parser, "_fast_page_texts",
+                        lambda path: (_ for _ in ()).throw(AssertionError("fast path used")))
+    monkeypatch.setattr(pdf_parser, "_layout_page_texts", lambda path, indices=None: {1: "b", 0: "a"})
+    assert pdf_parser.extract_text("x.pdf", mode="layout") == ["a", "b"]
+
+def test_extract_text_unknown_mode():
+    with pytest.raises(PDFAnalysisError, match="Unknown extraction mode"):
+        pdf_parser.extract_text("x.pdf", mode="turbo")
+
+def test_extract_text_fast_and_layout_agree_on_real_pdf(tmp_path, monkeypatch, write_pdf):
+    pages = [
+        ["Section 1. Purpose and intent of this zoning bylaw.",
+         "Section 2. Definitions used throughout the bylaw."],
+        ["Section 3. Dimensional requirements for residential districts."],
+    ]
+    pdf = tmp_path / "ordinance.pdf"
+    write_pdf(pdf, pages)
+
+    layout = pdf_parser.extract_text(str(pdf), mode="layout")
+    # Clean text pages must be served by PDFium alone, without layout fallback
+    monkeypatch.setattr(pdf_parser, "_layout_page_texts",
+                        lambda *a, **kw: (_ for _ in ()).throw(AssertionError("fell back")))
+    fast = pdf_parser.extract_text(str(pdf), mode="fast")
+
+    assert fast == ["\n".join(lines) for lines in pages]
+    assert [p.split() for p in fast] == [p.split() for p in layout]
+    assert "\r" not in "".join(fast)
+
+def test_fast_extraction_waits_for_pdfium_lock(tmp_path, write_pdf):
+    import threading
+    pdf = tmp_path / "ordinance.pdf"
+    write_pdf(pdf, [["Section 1. Purpose and intent of this zoning bylaw."]])
+    done = threading.Event()
+    with pdf_parser.PDFIUM_LOCK:
+        worker = threading.Thread(target=lambda: (pdf_parser._fast_page_texts(str(pdf)), done.set()))
+        worker.start()
+        assert not done.wait(0.1)          # blocked while another thread holds PDFium
+    worker.join(timeout=5)
+    assert done.is_set()
@@ -0,0 +1,63 @@
+# tests/test_api.py
+# tests the routes in analysis_api.py.
+
+import pytest
+import analysis_api
+from ordinance_finder import app
+from utils.score_store import ScoreStore, rubric_version
+
+pytestmark = pytest.mark.usefixtures("reset_admission_quotas")
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = ScoreStore(str(tmp_path / "scores.db"))
+    monkeypatch.setattr(analysis_api, "score_store", store)
+    return store
+
+@pytest.fixture
+def client(store):
+    with app.test_client() as client:
+        yield client
+
+def test_analyze_stores_scores_for_named_town(client, store, monkeypatch, best_practices):
+    monkeypatch.setattr(analysis_api, "_lazy_json", lambda path: best_practices)
+    monkeypatch.setattr(analysis_api.pdf_parser, "analyze_pdf", lambda **kw: {
+        "summary": "S", "scores": {"parking_requirements": 75, "total": 70}, "ordinance_hash": "abc",
+    })
+
+    response = client.post("/api/analyze", json={"link": "http://x/z.pdf", "city": "Arlington, MA"})
+
+    assert response.status_code == 202
+    ranked = store.rank(rubric_version(best_practices), "parking_requirements")
+    assert ranked[0]["town"] == "Arlington, MA"
+    assert ranked[0]["ordinance_hash"] == "abc"
+
+def test_rankings_by_category(client, store, monkeypatch, best_practices):
+    monkeypatch.setattr(analysis_api, "_lazy_json", lambda path: best_practices)
+    store.record("Arlington, MA", {"parking_requirements": 40}, best_practices)
+    store.record("Cambridge, MA", {"parking_requirements": 90}, best_practices)
+
+    response = client.get("/api/rankings?category=parking_requirements&limit=1")
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["rubric_version"] == rubric_version(best_practices)
+    assert [t["town"] for t in body["towns"]] == ["Cambridge, MA"]
+    assert body["stats"]["count"] == 2
+
+def test_rankings_summary_without_category(client, store, best_practices):
+    store.record("Arlington, MA", {"parking_requirements": 40}, best_practices)
+    response = client.get(f"/api/rankings?rubric_version={rubric_version(best_practices)}")
+    assert [c["category"] for c in response.get_json()["categories"]] == ["parking_requirements"]
+
+def test_rankings_bad_arguments(client):
+    assert client.get("/api/rankings?category=x&min_score=abc").status_code == 400
+    assert client.get("/api/rankings?category=x&order=sideways").status_code == 400
+    assert client.get("/api/rankings?category=x&limit=ten").status_code == 400
+
+def test_rankings_limit_is_clamped(client, store, best_practices):
+    for i in range(3):
+        store.record(f"Town{i}, MA", {"parking_requirements": i}, best_practices)
+    for limit, expected in (("-1", 1), ("0", 1), ("2", 2)):
+        response = client.get(f"/api/rankings?rubric_version={rubric_version(best_practices)}&category=parking_requirements&limit={limit}")
+        assert len(response.get_json()["towns"]) == expected
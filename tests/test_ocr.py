@@ -0,0 +1,97 @@
+# tests/test_ocr.py
+# tests logic in utils/ocr.py and the OCR fallback in pdf_parser.extract_text.
+# Rasterisation, hashing, caching and the process pool run for real; only the
+# Tesseract call is replaced, by module-level engines the (forkserver / spawn)
+# workers can unpickle, so these run without tesseract installed.
+
+import os
+import hashlib
+import pytest
+import utils.ocr as ocr
+import utils.pdf_parser as pdf_parser
+from utils.pdf_parser import PDFAnalysisError
+
+# Filled rectangles: no text layer, but distinct page images
+SCAN_A = "0 0 0 rg 72 600 300 40 re f\n"
+SCAN_B = "0 0 0 rg 72 400 200 80 re f\n"
+
+def _fake_ocr(image, lang):
+    return "OCR " + hashlib.md5(image.tobytes()).hexdigest()[:8]
+
+def _engine_must_not_run(image, lang):
+    raise AssertionError("page should have been served from the OCR cache")
+
+def _worker_thread_limit(image, lang):
+    return os.environ.get("OMP_THREAD_LIMIT", "unset")
+
+@pytest.fixture(autouse=True)
+def small_pool():
+    configured = ocr.OCR_WORKERS
+    ocr.reset_pool(workers=2)
+    yield
+    ocr.reset_pool(workers=configured)
+
+def test_ocr_pages_caches_by_page_image(tmp_path, write_pdf):
+    pdf = tmp_path / "scan.pdf"
+    write_pdf(pdf, [SCAN_A, SCAN_B, SCAN_A])
+    cache = tmp_path / "cache"
+    progress = []
+
+    texts = ocr.ocr_pages(str(pdf), [0, 1, 2], dpi=72, cache_dir=str(cache), engine=_fake_ocr,
+                          progress=lambda done, total: progress.append((done, total)))
+
+    assert texts[0] == texts[2] != texts[1]        # page 2 renders identically to page 0
+    assert len(list(cache.glob("*.txt"))) == 2
+    assert progress == [(1, 3), (2, 3), (3, 3)]
+
+    again = ocr.ocr_pages(str(pdf), [0, 1, 2], dpi=72, cache_dir=str(cache),
+                          engine=_engine_must_not_run, progress=lambda *a: None)
+    assert again == texts
+
+def test_ocr_pages_runs_in_single_threaded_workers(tmp_path, write_pdf):
+    pdf = tmp_path / "scan.pdf"
+    write_pdf(pdf, [SCAN_A, SCAN_B])
+
+    texts = ocr.ocr_pages(str(pdf), [0, 1], dpi=72, cache_dir=None,
+                          engine=_worker_thread_limit, progress=lambda *a: None)
+
+    assert texts == {0: "1", 1: "1"}
+
+def test_ocr_pool_is_shared_and_spawned_without_fork(tmp_path, write_pdf):
+    pdf = tmp_path / "scan.pdf"
+    write_pdf(pdf, [SCAN_A])
+    ocr.ocr_pages(str(pdf), [0], dpi=72, cache_dir=None, engine=_fake_ocr, progress=lambda *a: None)
+    pool = ocr._pool
+    ocr.ocr_pages(str(pdf), [0], dpi=72, cache_dir=None, engine=_fake_ocr, progress=lambda *a: None)
+
+    assert ocr._pool is pool
+    assert pool._max_workers == 2
+    assert pool._mp_context.get_start_method() in ("forkserver", "spawn")
+
+def test_extract_text_only_ocrs_pages_without_text_layer(tmp_path, write_pdf, monkeypatch):
+    monkeypatch.setattr(ocr, "ocr_available", lambda: True)
+    monkeypatch.setattr(ocr, "OCR_CACHE_DIR", str(tmp_path / "cache"))
+    requested = []
+    real_ocr_pages = ocr.ocr_pages
+    def spy(path, indices, **kw):
+        requested.extend(indices)
+        return real_ocr_pages(path, indices, dpi=72, cache_dir=None, engine=_fake_ocr, **kw)
+    monkeypatch.setattr(ocr, "ocr_pages", spy)
+    pdf = tmp_path / "mixed.pdf"
+    write_pdf(pdf, [["Section 1. Purpose and intent of this zoning bylaw."], SCAN_B])
+
+    pages = pdf_parser.extract_text(str(pdf), mode="fast", use_ocr=True, progress=lambda *a: None)
+
+    assert requested == [1]
+    assert pages[0] == "Section 1. Purpose and intent of this zoning bylaw."
+    assert pages[1].startswith("OCR ")
+
+def test_extract_text_scanned_without_ocr(tmp_path, write_pdf, monkeypatch):
+    pdf = tmp_path / "scan.pdf"
+    write_pdf(pdf, [SCAN_A])
+    monkeypatch.setattr(ocr, "ocr_available", lambda: False)
+
+    with pytest.raises(PDFAnalysisError, match="OCR is unavailable"):
+        pdf_parser.extract_text(str(pdf), use_ocr=True)
+    with pytest.raises(PDFAnalysisError, match=r"no extractable text \(likely scanned\)\.$"):
+        pdf_parser.extract_text(str(pdf), use_ocr=False)
@@ -9,6 +9,8 @@ from unittest.mock import MagicMock, patch
 # Import the Flask app instance and functions from your module
 from ordinance_finder import app, parse_zoning_response, get_zoning_ordinance
 
+pytestmark = pytest.mark.usefixtures("reset_admission_quotas")
+
 # -----------------
 # Pytest Fixtures
 # -----------------
@@ -0,0 +1,197 @@
+# tests/test_ordinance_registry.py
+# tests logic in utils/ordinance_registry.py and the registry-backed
+# /api/zoning, /api/zoning/confirm and /api/zoning/reject routes.
+
+import pytest
+from unittest.mock import patch
+
+import ordinance_finder
+from ordinance_finder import app
+from utils.ordinance_registry import (
+    OrdinanceRegistry, RegistryRefresher, RegistryError,
+    normalize_city, extract_document_date,
+)
+
+pytestmark = pytest.mark.usefixtures("reset_admission_quotas")
+
+CONFIRMED = {
+    'city': 'Arlington, MA',
+    'link': 'http://arlington.gov/zoning.pdf',
+    'file_type': 'PDF',
+    'notes': 'Zoning bylaw as amended through April 2024.',
+}
+
+@pytest.fixture
+def registry(tmp_path):
+    return OrdinanceRegistry(str(tmp_path / "registry.db"))
+
+@pytest.fixture
+def client(registry, monkeypatch):
+    monkeypatch.setattr(ordinance_finder, "registry", registry)
+    with app.test_client() as client:
+        yield client
+
+# -----------------
+# ## 1. Normalisation helpers
+# -----------------
+
+def test_normalize_city_variants_share_a_key():
+    assert normalize_city("City of Arlington, Massachusetts") == "arlington ma"
+    assert normalize_city("  arlington   MA ") == "arlington ma"
+    assert normalize_city("Charleston, West Virginia") == "charleston wv"
+
+def test_extract_document_date():
+    assert extract_document_date("Adopted 2023-05-01, amended 2024") == "2023-05-01"
+    assert extract_document_date("As amended through April 2024.") == "April 2024"
+    assert extract_document_date("Versions from 2019 and 2022 exist") == "2022"
+    assert extract_document_date(None) is None
+
+# -----------------
+# ## 2. OrdinanceRegistry
+# -----------------
+
+def test_lookup_on_missing_db_does_not_create_file(registry, tmp_path):
+    assert registry.lookup("Arlington, MA") is None
+    assert not (tmp_path / "registry.db").exists()
+
+def test_confirm_then_exact_and_fuzzy_lookup(registry):
+    registry.confirm(CONFIRMED, query="arlington massachusetts")
+
+    exact = registry.lookup("Arlington, Massachusetts")
+    assert exact['link'] == CONFIRMED['link']
+    assert exact['document_date'] == "April 2024"
+
+    assert registry.lookup("Arlingtn, MA")['link'] == CONFIRMED['link']
+    # Same town name in a different state must not match
+    assert registry.lookup("Arlington, TX") is None
+
+def test_stateless_query_is_not_stored_as_alias(registry):
+    registry.confirm(CONFIRMED, query="Arlington")
+    assert registry.lookup("Arlington, VA") is None
+    # The only stored Arlington is unambiguous without a state...
+    assert registry.lookup("Arlington")['link'] == CONFIRMED['link']
+    # ...until another state's Arlington is confirmed
+    registry.confirm({**CONFIRMED, 'city': 'Arlington, VA', 'link': 'http://arlingtonva.us/z.pdf'})
+    assert registry.lookup("Arlington") is None
+
+def test_fuzzy_match_does_not_cross_towns_or_states(registry):
+    registry.confirm({**CONFIRMED, 'city': 'Newton, MA'})
+    assert registry.lookup("Newtown") is None
+    assert registry.lookup("Newtown, MA") is None
+    registry.confirm({**CONFIRMED, 'city': 'Springfield', 'link': 'http://nostate.gov/z.pdf'})
+    # A query naming a state never falls back to a key without one
+    assert registry.lookup("Springfield, IL") is None
+
+def test_confirm_ignores_caller_supplied_hash_and_date(registry):
+    registry.confirm({**CONFIRMED, 'content_hash': 'forged', 'document_date': '1999'})
+    entry = registry.lookup("Arlington, MA")
+    assert entry['content_hash'] is None
+    assert entry['document_date'] == "April 2024"
+
+def test_confirm_requires_city_and_link(registry):
+    with pytest.raises(RegistryError):
+        registry.confirm({'city': 'Nowhere', 'link': ''})
+
+def test_reject_removes_entry(registry):
+    registry.confirm(CONFIRMED)
+    assert registry.reject("Arlington, MA", link="http://other.gov/x.pdf") == 0
+    assert registry.reject("Arlington, MA", link=CONFIRMED['link']) == 1
+    assert registry.lookup("Arlington, MA") is None
+
+def test_reject_by_link_removes_every_alias(registry):
+    registry.confirm(CONFIRMED, query="Arlington, Massachusetts")
+    registry.confirm(CONFIRMED, query="Town of Arlington MA")
+    assert registry.reject("Arlington, MA", link=CONFIRMED['link']) == 1
+    assert registry.lookup("Arlington") is None
+    assert registry.lookup("Town of Arlington, Massachusetts") is None
+
+def test_refresher_records_hashes_and_failures(registry):
+    registry.confirm(CONFIRMED)
+    registry.confirm({**CONFIRMED, 'city': 'Lexington, MA', 'link': 'http://bad.link'})
+
+    def fake_hash(link):
+        if "bad" in link:
+            raise IOError("404")
+        return "abc123"
+
+    refresher = RegistryRefresher(registry, fetch_hash=fake_hash)
+    assert refresher.run_once() == 2
+    assert registry.lookup("Arlington, MA")['content_hash'] == "abc123"
+    assert registry.lookup("Lexington, MA")['checked_at'] is not None
+    # Arlington was just checked; the failed Lexington link is retried every pass
+    assert refresher.run_once() == 1
+    assert registry.lookup("Lexington, MA") is not None
+    refresher.run_once()
+    assert registry.lookup("Lexington, MA") is None      # dead link stops being served
+
+def test_refresher_fetches_shared_link_once(registry):
+    registry.confirm(CONFIRMED, query="East Arlington, Massachusetts")
+    registry.confirm({**CONFIRMED, 'city': 'Arlington Center, MA'})
+    fetched = []
+    refresher = RegistryRefresher(registry, fetch_hash=lambda link: fetched.append(link) or "h1")
+
+    assert refresher.run_once() == 3
+    assert fetched == [CONFIRMED['link']]
+    assert registry.lookup("Arlington Center, MA")['content_hash'] == "h1"
+    assert registry.lookup("East Arlington MA")["content_hash"] == "h1"
+
+def test_changed_document_is_not_served_until_reconfirmed(registry):
+    registry.confirm(CONFIRMED)
+    registry.record_check("arlington ma", "v1")
+    registry.record_check("arlington ma", "v1")
+    assert registry.lookup("Arlington, MA")['content_hash'] == "v1"
+
+    registry.record_check("arlington ma", "v2")
+    assert registry.lookup("Arlington, MA") is None
+    registry.record_check("arlington ma", "v2")          # stays flagged
+    assert registry.lookup("Arlington, MA") is None
+
+    registry.confirm(CONFIRMED)
+    assert registry.lookup("Arlington, MA")['link'] == CONFIRMED['link']
+
+# -----------------
+# ## 3. Flask routes
+# -----------------
+
+@patch('ordinance_finder.get_zoning_ordinance')
+def test_api_zoning_served_from_registry(mock_get_ordinance, client, registry):
+    registry.confirm(CONFIRMED)
+
+    response = client.post('/api/zoning', json={'city': 'arlington ma'})
+
+    assert response.status_code == 200
+    assert response.get_json()['link'] == CONFIRMED['link']
+    assert response.get_json()['source'] == 'registry'
+    mock_get_ordinance.assert_not_called()
+
+@patch('ordinance_finder.get_zoning_ordinance')
+def test_api_zoning_confirm_and_reject(mock_get_ordinance, client, registry):
+    mock_get_ordinance.return_value = dict(CONFIRMED)
+    token = client.post('/api/zoning', json={'city': 'Arlington, Massachusetts'}).get_json()['feedback_token']
+
+    response = client.post('/api/zoning/confirm', json={'feedback_token': token})
+    assert response.status_code == 200
+    assert registry.lookup("Arlington")['link'] == CONFIRMED['link']
+
+    # Registry hits carry a token too, so a served entry can be rejected
+    hit = client.post('/api/zoning', json={'city': 'Arlington, MA'}).get_json()
+    assert hit['source'] == 'registry'
+    response = client.post('/api/zoning/reject', json={'feedback_token': hit['feedback_token']})
+    assert response.status_code == 200
+    assert response.get_json()['removed'] == 1
+    assert registry.lookup("Arlington, MA") is None
+
+def test_api_zoning_confirm_requires_served_result(client, registry):
+    # A client cannot plant its own link: city/link in the body are ignored
+    response = client.post('/api/zoning/confirm', json={**CONFIRMED, 'link': 'http://evil.example/x.pdf'})
+    assert response.status_code == 400
+    response = client.post('/api/zoning/confirm', json={'feedback_token': 'forged'})
+    assert response.status_code == 403
+    response = client.post('/api/zoning/reject', json={'feedback_token': 'forged'})
+    assert response.status_code == 403
+    assert registry.lookup("Arlington, MA") is None
+
+def test_api_zoning_feedback_token_expires(client, monkeypatch):
+    token = ordinance_finder.issue_feedback_token("Arlington, MA", CONFIRMED)
+    monkeypatch.setattr(ordinance_finder.time, "time", lambda: 10 ** 12)
+    assert ordinance_finder.redeem_feedback_token(token) is None
@@ -0,0 +1,74 @@
+# tests/test_score_store.py
+# tests logic in utils/score_store.py: flattening LLM score JSON, incremental
+# aggregates, and ranking queries.
+
+import copy
+import pytest
+from utils.score_store import ScoreStore, ScoreStoreError, flatten_scores, rubric_version
+
+CATEGORIES = {
+    "parking_requirements": ["residential_parking_minimums", "parking_maximums"],
+    "mixed_use_flexibility": ["mixed_use_zoning"],
+}
+
+@pytest.fixture
+def store(tmp_path):
+    return ScoreStore(str(tmp_path / "scores.db"))
+
+def test_flatten_scores_nested_shape():
+    rows = flatten_scores(
+        {"parking_requirements": {"residential_parking_minimums": 40, "parking_maximums": 80},
+         "mixed_use_flexibility": {"score": 55, "mixed_use_zoning": 60},
+         "total": 52},
+        CATEGORIES,
+    )
+    assert ("parking_requirements", "", 60.0) in rows          # mean of criteria
+    assert ("mixed_use_flexibility", "", 55.0) in rows         # explicit score wins
+    assert ("parking_requirements", "parking_maximums", 80.0) in rows
+    assert ("total", "", 52.0) in rows
+
+def test_flatten_scores_flat_shape_ignores_unknown_keys():
+    rows = flatten_scores({"parking_maximums": "70", "notes": "n/a", "bogus": 5}, CATEGORIES)
+    assert sorted(rows) == [("parking_requirements", "", 70.0),
+                            ("parking_requirements", "parking_maximums", 70.0)]
+
+def test_record_rejects_unusable_payloads(store, best_practices):
+    with pytest.raises(ScoreStoreError):
+        store.record("", {"total": 1}, best_practices)
+    with pytest.raises(ScoreStoreError):
+        store.record("Arlington, MA", {"nothing": "here"}, best_practices)
+
+def test_rank_and_incremental_aggregates(store, best_practices):
+    store.record("Arlington, MA", {"parking_requirements": 40, "total": 50}, best_practices, "h1")
+    store.record("Cambridge, MA", {"parking_requirements": 90, "total": 80}, best_practices, "h2")
+    store.record("Newton, MA", {"parking_requirements": 60, "total": 65}, best_practices, "h3")
+
+    ranked = store.rank(rubric_version(best_practices), "parking_requirements")
+    assert [r["town"] for r in ranked] == ["Cambridge, MA", "Newton, MA", "Arlington, MA"]
+    assert ranked[0]["rank"] == 1 and ranked[0]["ordinance_hash"] == "h2"
+
+    filtered = store.rank(rubric_version(best_practices), "parking_requirements", min_score=50, order="asc")
+    assert [r["town"] for r in filtered] == ["Newton, MA", "Cambridge, MA"]
+
+    # Re-analysing a town replaces its contribution instead of adding a second one
+    store.record("arlington massachusetts", {"parking_requirements": 70}, best_practices, "h4")
+    stats = store.category_stats(rubric_version(best_practices), "parking_requirements")[0]
+    assert stats["count"] == 3
+    assert stats["mean"] == pytest.approx((70 + 90 + 60) / 3, abs=0.01)
+    assert (stats["min"], stats["max"]) == (60, 90)
+
+    # Arlington's new analysis had no total, so only two towns keep one
+    totals = {s["category"]: s["count"] for s in store.category_stats(rubric_version(best_practices))}
+    assert totals == {"parking_requirements": 3, "total": 2}
+
+def test_queries_on_empty_store(store, tmp_path, best_practices):
+    assert store.rank(rubric_version(best_practices), "parking_requirements") == []
+    assert store.category_stats(rubric_version(best_practices)) == []
+    assert not (tmp_path / "scores.db").exists()
+
+def test_rubric_version_tracks_rubric_content(best_practices):
+    edited = copy.deepcopy(best_practices)
+    edited["zoning_best_practices_framework"]["evaluation_categories"]["parking_requirements"]["weight"] = 40
+    assert rubric_version(best_practices).startswith("1.0-")
+    assert rubric_version(edited) != rubric_version(best_practices)
+    assert rubric_version(copy.deepcopy(best_practices)) == rubric_version(best_practices)
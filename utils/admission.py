@@ -0,0 +1,185 @@
+"""
+Admission control for the expensive endpoints.
+─────────────────────────────────────────────
+/api/zoning (web-search agent call) and /api/analyze (Chrome + LLM job) each
+get an AdmissionLimit made of:
+
+• ConcurrencyLimiter – at most N requests in flight, a bounded wait queue
+                       behind them, and a queue timeout. Anything beyond that
+                       is shed with 503.
+• TokenBucketQuota   – per-client (remote address) request budget. Clients
+                       over budget get 429.
+
+Both rejections carry a Retry-After hint so well-behaved clients back off.
+"""
+
+import os
+import math
+import time
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Optional, Tuple
+from flask import jsonify, request
+
+
+class AdmissionRejected(Exception):
+    """Request refused by admission control (429 over quota, 503 saturated)."""
+
+    def __init__(self, status: int, message: str, retry_after: float):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = max(1, math.ceil(retry_after))
+
+    def to_response(self):
+        body = jsonify({'error': str(self), 'retry_after': self.retry_after})
+        return body, self.status, {'Retry-After': str(self.retry_after)}
+
+
+class ConcurrencyLimiter:
+    """Counting semaphore with a bounded, time-limited wait queue."""
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self._avg_service = 1.0        # EWMA of seconds per request, for Retry-After
+        self._cond = threading.Condition()
+
+    def retry_after(self) -> float:
+        """Rough time until a newly queued request would get a slot."""
+        return self._avg_service * (self.waiting + 1) / self.max_concurrent
+
+    def acquire(self, name: str = "endpoint") -> None:
+        with self._cond:
+            if self.active < self.max_concurrent:
+                self.active += 1
+                return
+            if self.waiting >= self.max_queue:
+                raise AdmissionRejected(503, f"{name} is at capacity, try again later",
+                                        self.retry_after())
+            self.waiting += 1
+            try:
+                deadline = time.monotonic() + self.queue_timeout
+                while self.active >= self.max_concurrent:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise AdmissionRejected(503, f"{name} is at capacity, try again later",
+                                                self.retry_after())
+                    self._cond.wait(remaining)
+                self.active += 1
+            finally:
+                self.waiting -= 1
+
+    def release(self, elapsed: float) -> None:
+        with self._cond:
+            self.active -= 1
+            self._avg_service = 0.8 * self._avg_service + 0.2 * elapsed
+            self._cond.notify()
+
+
+class TokenBucketQuota:
+    """Per-client token buckets; `rate_per_minute <= 0` disables the quota."""
+
+    def __init__(self, rate_per_minute: float, burst: int,
+                 clock: Callable[[], float] = time.monotonic, max_clients: int = 10000):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.clock = clock
+        self.max_clients = max_clients
+        self._buckets: Dict[str, Tuple[float, float]] = {}     # client -> (tokens, last refill)
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float) -> None:
+        # Buckets idle long enough to have refilled completely carry no state
+        full_after = self.burst / self.rate
+        self._buckets = {c: (t, last) for c, (t, last) in self._buckets.items()
+                         if now - last < full_after}
+
+    def take(self, client: str) -> float:
+        """Spend one token. Returns 0 if allowed, else seconds until a token is available."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = self.clock()
+            tokens, last = self._buckets.get(client, (float(self.burst), now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens >= 1:
+                self._buckets[client] = (tokens - 1, now)
+                if len(self._buckets) > self.max_clients:
+                    self._prune(now)
+                return 0.0
+            self._buckets[client] = (tokens, now)
+            return (1 - tokens) / self.rate
+
+    def refund(self, client: str) -> None:
+        """Give back a token spent on a request that was then shed without service."""
+        if self.rate <= 0:
+            return
+        with self._lock:
+            tokens, last = self._buckets.get(client, (float(self.burst), self.clock()))
+            self._buckets[client] = (min(self.burst, tokens + 1), last)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class AdmissionLimit:
+    """Quota + concurrency limit for one endpoint."""
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, queue_timeout: float,
+                 rate_per_minute: float, burst: int):
+        self.name = name
+        self.slots = ConcurrencyLimiter(max_concurrent, max_queue, queue_timeout)
+        self.quota = TokenBucketQuota(rate_per_minute, burst)
+
+    @classmethod
+    def from_env(cls, prefix: str, name: str, *, max_concurrent: int, max_queue: int,
+                 queue_timeout: float, rate_per_minute: float, burst: int) -> "AdmissionLimit":
+        """Defaults overridable via <PREFIX>_MAX_CONCURRENT, _MAX_QUEUE, _QUEUE_TIMEOUT, _RATE_PER_MINUTE, _BURST."""
+        env = lambda key, default, cast: cast(os.getenv(f"{prefix}_{key}", default))
+        return cls(
+            name,
+            max_concurrent=env("MAX_CONCURRENT", max_concurrent, int),
+            max_queue=env("MAX_QUEUE", max_queue, int),
+            queue_timeout=env("QUEUE_TIMEOUT", queue_timeout, float),
+            rate_per_minute=env("RATE_PER_MINUTE", rate_per_minute, float),
+            burst=env("BURST", burst, int),
+        )
+
+    @contextmanager
+    def admit(self, client: Optional[str] = None):
+        """Hold a slot for the duration of the block; raises AdmissionRejected."""
+        client = client or "unknown"
+        wait = self.quota.take(client)
+        if wait:
+            raise AdmissionRejected(429, f"Too many {self.name} requests, slow down", wait)
+        try:
+            self.slots.acquire(self.name)
+        except AdmissionRejected:
+            # Shed requests were never served; retrying after Retry-After must not cost quota
+            self.quota.refund(client)
+            raise
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.slots.release(time.monotonic() - start)
+
+    def guard(self, view):
+        """Flask view decorator: admit the whole request or answer 429/503."""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                with self.admit(request.remote_addr):
+                    return view(*args, **kwargs)
+            except AdmissionRejected as e:
+                return e.to_response()
+        return wrapper
+
+    def reset(self) -> None:
+        """Forget per-client quota state (tests, config reloads)."""
+        self.quota.reset()
@@ -0,0 +1,174 @@
+"""
+OCR fallback for scanned ordinances.
+─────────────────────────────────────────────
+Pages without a text layer are rasterised with PDFium and OCR'd by a local
+Tesseract install (optional: `pip install pytesseract` plus the `tesseract`
+binary). Pages from every job share one process pool of OCR_WORKERS
+processes, so concurrent analyses never use more cores than that, and PDFium
+rendering stays out of the web process. Each page's text is cached on disk
+under the sha256 of its rendered image, so re-analysing the same scan never
+re-runs OCR.
+"""
+
+import os
+import hashlib
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Iterable, Optional
+
+import pypdfium2 as pdfium
+
+OCR_ENABLED = os.getenv("PDF_OCR", "1") == "1"
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", os.cpu_count() or 1))
+OCR_DPI = int(os.getenv("OCR_DPI", 300))
+OCR_LANG = os.getenv("OCR_LANG", "eng")
+OCR_CACHE_DIR = os.getenv("OCR_CACHE_DIR", ".ocr_cache")
+
+ProgressCallback = Callable[[int, int], None]
+OCREngine = Callable[..., str]         # (image, lang) -> text; must be picklable
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+class OCRUnavailable(RuntimeError):
+    """Raised when OCR is needed but pytesseract / tesseract are not installed."""
+
+
+def ocr_available() -> bool:
+    try:
+        import pytesseract
+        pytesseract.get_tesseract_version()
+    except Exception:
+        return False
+    return True
+
+
+def _run_ocr(image, lang: str) -> str:
+    """The default engine. Any picklable module-level (image, lang) -> str works."""
+    import pytesseract
+    return pytesseract.image_to_string(image, lang=lang)
+
+
+def _image_hash(image, lang: str) -> str:
+    digest = hashlib.sha256()
+    digest.update(f"{lang}|{image.mode}|{image.size}|".encode())
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def _cache_read(cache_dir: Optional[str], key: str) -> Optional[str]:
+    if not cache_dir:
+        return None
+    try:
+        with open(os.path.join(cache_dir, f"{key}.txt"), "r", encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _cache_write(cache_dir: Optional[str], key: str, text: str) -> None:
+    if not cache_dir:
+        return
+    os.makedirs(cache_dir, exist_ok=True)
+    # Write-then-rename so concurrent workers never see a partial file
+    fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, os.path.join(cache_dir, f"{key}.txt"))
+
+
+def ocr_page(path: str, index: int, dpi: int = OCR_DPI, lang: str = OCR_LANG,
+             cache_dir: Optional[str] = OCR_CACHE_DIR,
+             engine: OCREngine = _run_ocr) -> tuple[int, str, bool]:
+    """Rasterise and OCR one page. Returns (index, text, served_from_cache)."""
+    pdf = pdfium.PdfDocument(path)
+    try:
+        page = pdf[index]
+        image = page.render(scale=dpi / 72, grayscale=True).to_pil()
+        page.close()
+    finally:
+        pdf.close()
+
+    key = _image_hash(image, lang)
+    cached = _cache_read(cache_dir, key)
+    if cached is not None:
+        return index, cached, True
+    text = engine(image, lang).strip()
+    _cache_write(cache_dir, key, text)
+    return index, text, False
+
+
+def _init_worker():
+    # One core per worker: stop Tesseract's own OpenMP threads oversubscribing
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Never fork: the web process has live threads (and PDFium state)
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _pool = ProcessPoolExecutor(max_workers=OCR_WORKERS, mp_context=context,
+                                        initializer=_init_worker)
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    # A worker died (e.g. OOM-killed); let the next call start a new pool
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+
+
+def reset_pool(workers: Optional[int] = None) -> None:
+    """Shut the shared pool down; the next OCR call starts a fresh one of `workers` processes."""
+    global _pool, OCR_WORKERS
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+        if workers is not None:
+            OCR_WORKERS = max(1, workers)
+
+
+def ocr_pages(path: str, indices: Iterable[int],
+              dpi: int = OCR_DPI, lang: str = OCR_LANG,
+              cache_dir: Optional[str] = OCR_CACHE_DIR,
+              progress: Optional[ProgressCallback] = None,
+              engine: OCREngine = _run_ocr) -> Dict[int, str]:
+    """
+    OCR the given page indices on the shared worker pool.
+    `progress(done, total)` is called after every finished page.
+    """
+    indices = list(indices)
+    total = len(indices)
+    texts: Dict[int, str] = {}
+    if not total:
+        return texts
+
+    def finished(index: int, text: str, cached: bool):
+        texts[index] = text
+        if progress:
+            progress(len(texts), total)
+        else:
+            print(f"OCR page {index + 1}: {len(texts)}/{total} done{' (cached)' if cached else ''}")
+
+    pool = _get_pool()
+    futures = [pool.submit(ocr_page, path, i, dpi, lang, cache_dir, engine) for i in indices]
+    try:
+        for future in as_completed(futures):
+            finished(*future.result())
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise
+    finally:
+        for future in futures:
+            future.cancel()
+    return texts
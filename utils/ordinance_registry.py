@@ -0,0 +1,381 @@
+"""
+Local registry of confirmed zoning ordinances.
+─────────────────────────────────────────────
+Every confirmed lookup ("This is Correct" in the UI) is stored in a small
+SQLite database keyed by a normalised city name, so repeat lookups can be
+answered without another web-search call.
+
+• OrdinanceRegistry  – lookup / confirm / reject / staleness bookkeeping
+• RegistryRefresher  – background thread that re-checks stale entries
+"""
+
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import difflib
+import threading
+import requests
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_DB_PATH = "ordinance_registry.db"
+STALE_AFTER_SECONDS = 30 * 24 * 3600     # re-check confirmed links monthly
+FUZZY_CUTOFF = 0.93                      # "arlingtn" -> "arlington", but not "newtown" -> "newton"
+MAX_CHECK_FAILURES = 3                   # consecutive failed re-checks before a link stops being served
+
+US_STATES = {
+    "alabama": "al", "alaska": "ak", "arizona": "az", "arkansas": "ar",
+    "california": "ca", "colorado": "co", "connecticut": "ct", "delaware": "de",
+    "florida": "fl", "georgia": "ga", "hawaii": "hi", "idaho": "id",
+    "illinois": "il", "indiana": "in", "iowa": "ia", "kansas": "ks",
+    "kentucky": "ky", "louisiana": "la", "maine": "me", "maryland": "md",
+    "massachusetts": "ma", "michigan": "mi", "minnesota": "mn",
+    "mississippi": "ms", "missouri": "mo", "montana": "mt", "nebraska": "ne",
+    "nevada": "nv", "new hampshire": "nh", "new jersey": "nj",
+    "new mexico": "nm", "new york": "ny", "north carolina": "nc",
+    "north dakota": "nd", "ohio": "oh", "oklahoma": "ok", "oregon": "or",
+    "pennsylvania": "pa", "rhode island": "ri", "south carolina": "sc",
+    "south dakota": "sd", "tennessee": "tn", "texas": "tx", "utah": "ut",
+    "vermont": "vt", "virginia": "va", "washington": "wa",
+    "west virginia": "wv", "wisconsin": "wi", "wyoming": "wy",
+    "district of columbia": "dc",
+}
+_STATE_ABBREVS = set(US_STATES.values())
+_STATES_BY_LENGTH = sorted(US_STATES.items(), key=lambda kv: -len(kv[0]))
+# WHERE-clause fragment for entries /api/zoning may answer with (bind MAX_CHECK_FAILURES)
+SERVABLE = "hash_changed = 0 AND check_failures < ?"
+_PREFIXES = ("city of ", "town of ", "township of ", "village of ", "borough of ")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ordinances (
+    city_key      TEXT PRIMARY KEY,
+    city          TEXT NOT NULL,
+    link          TEXT NOT NULL,
+    file_type     TEXT,
+    notes         TEXT,
+    document_date TEXT,
+    content_hash  TEXT,
+    confirmed_at  REAL NOT NULL,
+    checked_at    REAL,
+    check_failures INTEGER NOT NULL DEFAULT 0,
+    hash_changed  INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_ordinances_checked_at ON ordinances (checked_at);
+"""
+
+
+class RegistryError(RuntimeError):
+    """Raised when a registry write is rejected (bad input, DB failure)."""
+
+
+def normalize_city(name: str) -> str:
+    """
+    Canonical key for a city string.
+    "City of Arlington, Massachusetts" and "arlington ma" both -> "arlington ma".
+    """
+    key = re.sub(r"[^a-z0-9]+", " ", (name or "").lower()).strip()
+    for prefix in _PREFIXES:
+        if key.startswith(prefix):
+            key = key[len(prefix):]
+            break
+    # Trailing full state name -> two-letter abbreviation (longest first,
+    # so "west virginia" wins over "virginia")
+    for state, abbrev in _STATES_BY_LENGTH:
+        if key == state:
+            break
+        if key.endswith(" " + state):
+            key = key[: -len(state)] + abbrev
+            break
+    return key
+
+
+def _split_state(key: str) -> tuple[str, Optional[str]]:
+    """Split a normalised key into (town, state-abbrev or None)."""
+    head, _, tail = key.rpartition(" ")
+    if head and tail in _STATE_ABBREVS:
+        return head, tail
+    return key, None
+
+
+def extract_document_date(notes: Optional[str]) -> Optional[str]:
+    """Best-effort document date from the finder's notes (ISO date, 'Month YYYY' or year)."""
+    if not notes:
+        return None
+    iso = re.search(r"\b(19|20)\d{2}-\d{2}-\d{2}\b", notes)
+    if iso:
+        return iso.group(0)
+    month = re.search(
+        r"\b(January|February|March|April|May|June|July|August|September|"
+        r"October|November|December)\s+(?:\d{1,2},\s*)?((?:19|20)\d{2})\b",
+        notes,
+    )
+    if month:
+        return f"{month.group(1)} {month.group(2)}"
+    year = re.findall(r"\b(?:19|20)\d{2}\b", notes)
+    return max(year) if year else None
+
+
+def fetch_content_hash(link: str, timeout: int = 30) -> str:
+    """Download a document and return the sha256 of its bytes."""
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    }
+    digest = hashlib.sha256()
+    with requests.get(link, stream=True, timeout=timeout, headers=headers) as resp:
+        resp.raise_for_status()
+        for chunk in resp.iter_content(chunk_size=65536):
+            if chunk:
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+class OrdinanceRegistry:
+    """SQLite-backed city -> confirmed ordinance store."""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, fuzzy_cutoff: float = FUZZY_CUTOFF):
+        self.db_path = db_path
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self._lock = threading.Lock()
+        self._schema_ready = False
+        self._keys: Optional[List[str]] = None     # in-memory key index for fuzzy matching
+
+    # --- internals ---------------------------------------------------------
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        if not self._schema_ready:
+            with self._lock:
+                conn.executescript(SCHEMA)
+                self._schema_ready = True
+        return conn
+
+    @contextmanager
+    def _session(self):
+        conn = self._connect()
+        try:
+            with conn:          # commit / rollback
+                yield conn
+        finally:
+            conn.close()
+
+    def _all_keys(self, conn: sqlite3.Connection) -> List[str]:
+        if self._keys is None:
+            self._keys = [r["city_key"] for r in conn.execute(
+                "SELECT city_key FROM ordinances WHERE " + SERVABLE, (MAX_CHECK_FAILURES,))]
+        return self._keys
+
+    def _fuzzy_key(self, key: str, conn: sqlite3.Connection) -> Optional[str]:
+        """
+        Closest stored key that can safely stand in for `key`.
+
+        A query naming a state only matches keys in that state (typos in the
+        town name are tolerated). A query without a state must name the town
+        exactly and only matches when a single stored entry has that town name -
+        "Arlington" is ambiguous once MA and VA are both stored.
+        """
+        town, state = _split_state(key)
+        if state:
+            candidates = {}
+            for stored in self._all_keys(conn):
+                stored_town, stored_state = _split_state(stored)
+                if stored_state == state:
+                    candidates[stored_town] = stored
+            match = difflib.get_close_matches(town, list(candidates), n=1, cutoff=self.fuzzy_cutoff)
+            return candidates[match[0]] if match else None
+
+        same_town = [k for k in self._all_keys(conn) if _split_state(k)[0] == town]
+        return same_town[0] if len(same_town) == 1 else None
+
+    @staticmethod
+    def _row_to_result(row: sqlite3.Row) -> Dict:
+        return {
+            'city': row["city"],
+            'link': row["link"],
+            'file_type': row["file_type"],
+            'notes': row["notes"],
+            'document_date': row["document_date"],
+            'content_hash': row["content_hash"],
+            'confirmed_at': row["confirmed_at"],
+            'checked_at': row["checked_at"],
+        }
+
+    # --- public API --------------------------------------------------------
+    def lookup(self, city_name: str) -> Optional[Dict]:
+        """
+        Return the confirmed entry for a city (exact, then fuzzy match) or None.
+        Entries whose document changed or whose link keeps failing since they
+        were confirmed are skipped, so the caller falls back to a fresh search.
+        """
+        key = normalize_city(city_name)
+        if not key or not os.path.exists(self.db_path):
+            return None
+        query = "SELECT * FROM ordinances WHERE city_key = ? AND " + SERVABLE
+        with self._session() as conn:
+            row = conn.execute(query, (key, MAX_CHECK_FAILURES)).fetchone()
+            if row is None:
+                fuzzy = self._fuzzy_key(key, conn)
+                if fuzzy:
+                    row = conn.execute(query, (fuzzy, MAX_CHECK_FAILURES)).fetchone()
+        return self._row_to_result(row) if row else None
+
+    def confirm(self, result: Dict, query: Optional[str] = None) -> Dict:
+        """
+        Store a user-confirmed lookup. The entry is keyed under the returned
+        city name, and also under the original search text when that names a
+        state (a bare "Arlington" alias would shadow every other Arlington).
+        """
+        city = (result.get('city') or "").strip()
+        link = (result.get('link') or "").strip()
+        if not city or not link:
+            raise RegistryError("Both 'city' and 'link' are required to confirm an ordinance")
+
+        keys = {normalize_city(city)}
+        query_key = normalize_city(query or "")
+        if query_key and _split_state(query_key)[1]:
+            keys.add(query_key)
+        # The content hash is computed by the refresher, never taken from the caller
+        notes = result.get('notes')
+        row = (
+            city, link, result.get('file_type'), notes,
+            extract_document_date(notes), None, time.time(),
+        )
+        try:
+            with self._session() as conn:
+                for key in keys:
+                    conn.execute(
+                        """
+                        INSERT INTO ordinances
+                            (city_key, city, link, file_type, notes, document_date,
+                             content_hash, confirmed_at, checked_at, check_failures,
+                             hash_changed)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, NULL, 0, 0)
+                        ON CONFLICT(city_key) DO UPDATE SET
+                            city = excluded.city, link = excluded.link,
+                            file_type = excluded.file_type, notes = excluded.notes,
+                            document_date = excluded.document_date,
+                            content_hash = excluded.content_hash,
+                            confirmed_at = excluded.confirmed_at,
+                            checked_at = NULL, check_failures = 0, hash_changed = 0
+                        """,
+                        (key, *row),
+                    )
+        except sqlite3.Error as e:
+            raise RegistryError(f"Could not store confirmed ordinance: {e}") from e
+        self._keys = None
+        return self.lookup(city)
+
+    def reject(self, city_name: str, link: Optional[str] = None) -> int:
+        """
+        Drop a rejected ordinance. With `link`, every entry pointing at that
+        link goes (including aliases); otherwise the city's own entry. Returns rows removed.
+        """
+        key = normalize_city(city_name)
+        if not os.path.exists(self.db_path) or not (key or link):
+            return 0
+        with self._session() as conn:
+            if link:
+                cur = conn.execute("DELETE FROM ordinances WHERE link = ?", (link,))
+            else:
+                cur = conn.execute("DELETE FROM ordinances WHERE city_key = ?", (key,))
+        self._keys = None
+        return cur.rowcount
+
+    def stale_entries(self, max_age: float = STALE_AFTER_SECONDS, limit: int = 20) -> List[Dict]:
+        """
+        Entries never checked, last checked more than `max_age` seconds ago, or
+        whose last check failed (retried every pass until they recover).
+        """
+        if not os.path.exists(self.db_path):
+            return []
+        cutoff = time.time() - max_age
+        with self._session() as conn:
+            rows = conn.execute(
+                """
+                SELECT city_key, link, content_hash FROM ordinances
+                WHERE checked_at IS NULL OR checked_at < ? OR check_failures > 0
+                ORDER BY COALESCE(checked_at, 0) LIMIT ?
+                """,
+                (cutoff, limit),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def record_check(self, city_key: str, content_hash: Optional[str]) -> None:
+        """
+        Store the outcome of a re-check; `content_hash=None` counts as a failed fetch.
+        A hash that differs from the one recorded earlier flags the entry as changed
+        until it is confirmed again.
+        """
+        with self._session() as conn:
+            if content_hash is None:
+                conn.execute(
+                    "UPDATE ordinances SET checked_at = ?, check_failures = check_failures + 1 "
+                    "WHERE city_key = ?",
+                    (time.time(), city_key),
+                )
+            else:
+                conn.execute(
+                    "UPDATE ordinances SET checked_at = ?, check_failures = 0, "
+                    "hash_changed = hash_changed OR (content_hash IS NOT NULL AND content_hash != ?), "
+                    "content_hash = ? WHERE city_key = ?",
+                    (time.time(), content_hash, content_hash, city_key),
+                )
+        self._keys = None
+
+
+class RegistryRefresher:
+    """Daemon thread that periodically re-hashes stale registry entries off the request path."""
+
+    def __init__(self, registry: OrdinanceRegistry, interval: float = 3600,
+                 max_age: float = STALE_AFTER_SECONDS,
+                 fetch_hash: Callable[[str], str] = fetch_content_hash):
+        self.registry = registry
+        self.interval = interval
+        self.max_age = max_age
+        self.fetch_hash = fetch_hash
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> int:
+        """
+        Re-check one batch of stale entries. Aliases sharing a link are fetched
+        once and all updated from that download. Returns the number of entries checked.
+        """
+        entries = self.registry.stale_entries(self.max_age)
+        by_link: Dict[str, List[Dict]] = {}
+        for entry in entries:
+            by_link.setdefault(entry["link"], []).append(entry)
+
+        for link, same_link in by_link.items():
+            try:
+                new_hash = self.fetch_hash(link)
+            except Exception as e:
+                print(f"Registry re-check failed for {link}: {e}")
+                new_hash = None
+            for entry in same_link:
+                if new_hash and entry["content_hash"] and new_hash != entry["content_hash"]:
+                    print(f"Ordinance for {entry['city_key']} changed since it was confirmed; "
+                          "it will not be served until confirmed again.")
+                self.registry.record_check(entry["city_key"], new_hash)
+        return len(entries)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Registry refresh pass failed: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self) -> "RegistryRefresher":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="registry-refresher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
@@ -1,10 +1,14 @@
 import os
+import hashlib
 import tempfile
+import threading
 import time
 import json
 import requests
 import pdfplumber
-from typing import List, Dict
+import pypdfium2 as pdfium     # installed with pdfplumber
+from typing import List, Dict, Iterable, Optional
+from utils import ocr
 
 # Selenium imports
 from selenium import webdriver
@@ -14,6 +18,16 @@ from selenium.webdriver.chrome.options import Options
 
 PDF_SIZE_LIMIT = 40 * 1024 * 1024
 
+# "layout": pdfplumber character-level layout analysis on every page (slow).
+# "fast":   raw PDFium text stream, with per-page layout fallback for pages
+#           whose fast output is empty or looks garbled.
+EXTRACT_MODES = ("fast", "layout")
+EXTRACT_MODE = os.getenv("PDF_EXTRACT_MODE", "fast")
+
+# PDFium is not thread-safe, even across documents: every in-process call
+# must hold this lock (Flask serves requests on several threads).
+PDFIUM_LOCK = threading.Lock()
+
 class PDFAnalysisError(RuntimeError):
     """Any failure you want to bubble back to /api/status."""
 
@@ -76,16 +90,93 @@ def download_pdf(url: str, timeout: int = 45) -> str:
         raise PDFAnalysisError(f"Failed to download PDF with Selenium/Requests: {e}") from e
 
 
-def extract_text(path: str) -> List[str]:
-    """Return page-text list, raise if nothing extractable."""
+def file_sha256(path: str) -> str:
+    """Content hash of a downloaded document (identifies the ordinance version)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(65536), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _looks_garbled(text: str) -> bool:
+    """Heuristic: True if a fast-path page is empty or mostly non-text glyphs."""
+    chars = [c for c in text if not c.isspace()]
+    if len(chars) < 20:
+        return True
+    if "\ufffd" in text or "(cid:" in text:
+        return True
+    readable = sum(1 for c in chars if c.isalnum() or c in ".,;:()[]-'\"/§%$&")
+    return readable / len(chars) < 0.85
+
+
+def _fast_page_texts(path: str) -> List[str]:
+    """Raw text-stream extraction via PDFium, no layout analysis."""
+    pages = []
+    with PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(path)
+        try:
+            for page in pdf:
+                textpage = page.get_textpage()
+                pages.append(textpage.get_text_range().replace("\r\n", "\n").strip())
+                textpage.close()
+                page.close()
+        finally:
+            pdf.close()
+    return pages
+
+
+def _layout_page_texts(path: str, indices: Optional[Iterable[int]] = None) -> Dict[int, str]:
+    """pdfplumber layout-mode text for the given page indices (all pages if None)."""
+    texts = {}
+    with pdfplumber.open(path) as pdf:
+        wanted = range(len(pdf.pages)) if indices is None else indices
+        for i in wanted:
+            page = pdf.pages[i]
+            txt = page.extract_text(x_tolerance=1.5, y_tolerance=3) or ""
+            texts[i] = txt.strip()
+            page.close()        # drop cached layout objects between pages
+    return texts
+
+
+def extract_text(path: str, mode: Optional[str] = None, use_ocr: Optional[bool] = None,
+                 progress: Optional[ocr.ProgressCallback] = None) -> List[str]:
+    """
+    Return page-text list, raise if nothing extractable.
+    Pages with no text layer are OCR'd when OCR is enabled and installed;
+    `progress(done, total)` reports OCR progress per page.
+    """
+    use_ocr = ocr.OCR_ENABLED if use_ocr is None else use_ocr
+    mode = mode or EXTRACT_MODE
+    if mode not in EXTRACT_MODES:
+        raise PDFAnalysisError(f"Unknown extraction mode {mode!r}; expected one of {EXTRACT_MODES}")
     try:
-        pages = []
-        with pdfplumber.open(path) as pdf:
-            for page in pdf.pages:
-                txt = page.extract_text(x_tolerance=1.5, y_tolerance=3) or ""
-                pages.append(txt.strip())
+        if mode == "layout":
+            layout = _layout_page_texts(path)
+            pages = [layout[i] for i in sorted(layout)]
+        else:
+            pages = _fast_page_texts(path)
+            redo = [i for i, txt in enumerate(pages) if _looks_garbled(txt)]
+            if redo:
+                print(f"Fast extraction fell back to layout mode on {len(redo)}/{len(pages)} pages.")
+                for i, txt in _layout_page_texts(path, redo).items():
+                    pages[i] = txt
     except Exception as e:
         raise PDFAnalysisError(f"Could not read PDF: {e}") from e
+
+    blank = [i for i, txt in enumerate(pages) if not txt]
+    if blank and use_ocr:
+        if ocr.ocr_available():
+            print(f"Running OCR on {len(blank)}/{len(pages)} pages without a text layer.")
+            try:
+                for i, txt in ocr.ocr_pages(path, blank, progress=progress).items():
+                    pages[i] = txt
+            except Exception as e:
+                raise PDFAnalysisError(f"OCR failed: {e}") from e
+        elif not any(pages):
+            raise PDFAnalysisError(
+                "PDF contains no extractable text (likely scanned) and OCR is unavailable; "
+                "install pytesseract and the tesseract binary.")
     if not any(pages):
         raise PDFAnalysisError("PDF contains no extractable text (likely scanned).")
     return pages
@@ -140,11 +231,18 @@ def analyze_pdf(url: str, client, best_practices_data: Dict) -> Dict:
         }
 
         path = download_pdf(url)
-        pages = extract_text(path)
+        ordinance_hash = file_sha256(path)
+        ocr_done = [0]
+        def log_ocr(done, total):
+            ocr_done[0] = done
+            print(f"OCR: {done}/{total} pages done")
+
+        pages = extract_text(path, progress=log_ocr)
         chunks = chunk_text(pages)
         summary = summarize_chunks(chunks, client)
         scores = score_document(summary, best_practices_data, weights, client)
-        return {"summary": summary, "scores": scores}
+        return {"summary": summary, "scores": scores, "ordinance_hash": ordinance_hash,
+                "page_count": len(pages), "ocr_pages": ocr_done[0]}
     finally:
         if path and os.path.exists(path):
              pass
@@ -0,0 +1,306 @@
+"""
+Persistent store of analysis scores for cross-town comparison.
+─────────────────────────────────────────────
+Each finished /api/analyze job is written as one `analyses` row plus one
+`scores` row per (category, criterion). The latest analysis per town and
+rubric version is mirrored into `latest_scores`, which is indexed by
+(rubric_version, category, criterion, score) so ranking queries are a
+single index range scan. Per-category count / sum / sum-of-squares live in
+`aggregates` and are adjusted incrementally whenever a town's latest score
+changes, so summary stats never rescan the table.
+
+Category-level scores use criterion "" and the weighted overall score is
+stored as category "total".
+"""
+
+import os
+import json
+import math
+import hashlib
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+from utils.ordinance_registry import normalize_city
+
+DEFAULT_DB_PATH = "zoning_scores.db"
+TOTAL = "total"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id             INTEGER PRIMARY KEY AUTOINCREMENT,
+    town_key       TEXT NOT NULL,
+    town           TEXT NOT NULL,
+    ordinance_hash TEXT,
+    rubric_version TEXT NOT NULL,
+    analyzed_at    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_town ON analyses (town_key, rubric_version);
+
+CREATE TABLE IF NOT EXISTS scores (
+    analysis_id INTEGER NOT NULL REFERENCES analyses (id),
+    category    TEXT NOT NULL,
+    criterion   TEXT NOT NULL,
+    score       REAL NOT NULL,
+    PRIMARY KEY (analysis_id, category, criterion)
+);
+
+CREATE TABLE IF NOT EXISTS latest_scores (
+    town_key       TEXT NOT NULL,
+    rubric_version TEXT NOT NULL,
+    category       TEXT NOT NULL,
+    criterion      TEXT NOT NULL,
+    score          REAL NOT NULL,
+    analysis_id    INTEGER NOT NULL,
+    PRIMARY KEY (town_key, rubric_version, category, criterion)
+);
+CREATE INDEX IF NOT EXISTS idx_latest_rank
+    ON latest_scores (rubric_version, category, criterion, score);
+
+CREATE TABLE IF NOT EXISTS aggregates (
+    rubric_version TEXT NOT NULL,
+    category       TEXT NOT NULL,
+    criterion      TEXT NOT NULL,
+    n              INTEGER NOT NULL,
+    total          REAL NOT NULL,
+    total_sq       REAL NOT NULL,
+    PRIMARY KEY (rubric_version, category, criterion)
+);
+"""
+
+
+class ScoreStoreError(RuntimeError):
+    """Raised for unusable score payloads or bad ranking queries."""
+
+
+def _as_score(value) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def flatten_scores(scores: Dict, categories: Dict[str, List[str]]) -> List[Tuple[str, str, float]]:
+    """
+    Turn the LLM's score JSON into (category, criterion, score) rows.
+
+    Accepts nested ({"parking_requirements": {"parking_maximums": 80, ...}}),
+    category-level ({"parking_requirements": 70}) and flat-criterion
+    ({"parking_maximums": 80}) shapes. Category scores missing from the
+    payload are filled with the mean of their criteria. Unknown keys are ignored.
+    """
+    criterion_to_category = {crit: cat for cat, crits in categories.items() for crit in crits}
+    category_scores: Dict[str, float] = {}
+    criterion_scores: Dict[Tuple[str, str], float] = {}
+
+    for key, value in scores.items():
+        if key == TOTAL:
+            continue
+        if key in categories:
+            if isinstance(value, dict):
+                for crit, crit_value in value.items():
+                    score = _as_score(crit_value)
+                    if score is None:
+                        continue
+                    if crit in ("score", "total", "overall"):
+                        category_scores[key] = score
+                    else:
+                        criterion_scores[(key, crit)] = score
+            elif _as_score(value) is not None:
+                category_scores[key] = _as_score(value)
+        elif key in criterion_to_category and _as_score(value) is not None:
+            criterion_scores[(criterion_to_category[key], key)] = _as_score(value)
+
+    for cat in categories:
+        if cat not in category_scores:
+            crit_values = [s for (c, _), s in criterion_scores.items() if c == cat]
+            if crit_values:
+                category_scores[cat] = sum(crit_values) / len(crit_values)
+
+    rows = [(cat, "", s) for cat, s in category_scores.items()]
+    rows += [(cat, crit, s) for (cat, crit), s in criterion_scores.items()]
+    total = _as_score(scores.get(TOTAL))
+    if total is not None:
+        rows.append((TOTAL, "", total))
+    return rows
+
+
+def rubric_categories(best_practices_data: Dict) -> Dict[str, List[str]]:
+    """category -> criterion names from config/best_practices.json."""
+    cats = best_practices_data['zoning_best_practices_framework']['evaluation_categories']
+    return {name: list(data.get('criteria', {})) for name, data in cats.items()}
+
+
+def rubric_version(best_practices_data: Dict) -> str:
+    """
+    "<metadata.version>-<hash of evaluation_categories>", so editing the rubric
+    without bumping its version still keeps old and new scores apart.
+    """
+    framework = best_practices_data['zoning_best_practices_framework']
+    declared = str(framework.get('metadata', {}).get('version', 'unversioned'))
+    canonical = json.dumps(framework['evaluation_categories'], sort_keys=True, separators=(",", ":"))
+    return f"{declared}-{hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:8]}"
+
+
+class ScoreStore:
+    """SQLite-backed store of per-town analysis scores with incremental aggregates."""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()     # serialises read-modify-write of aggregates
+        self._schema_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        if not self._schema_ready:
+            with self._lock:
+                conn.executescript(SCHEMA)
+                self._schema_ready = True
+        return conn
+
+    @contextmanager
+    def _session(self):
+        conn = self._connect()
+        try:
+            with conn:          # commit / rollback
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _bump_aggregate(conn, version: str, category: str, criterion: str,
+                        score: float, sign: int) -> None:
+        conn.execute(
+            """
+            INSERT INTO aggregates (rubric_version, category, criterion, n, total, total_sq)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (rubric_version, category, criterion) DO UPDATE SET
+                n = n + excluded.n,
+                total = total + excluded.total,
+                total_sq = total_sq + excluded.total_sq
+            """,
+            (version, category, criterion, sign, sign * score, sign * score * score),
+        )
+
+    def record(self, town: str, scores: Dict, best_practices_data: Dict,
+               ordinance_hash: Optional[str] = None) -> int:
+        """Persist one analysis result and update latest/aggregate tables. Returns the analysis id."""
+        town_key = normalize_city(town)
+        if not town_key:
+            raise ScoreStoreError("A town name is required to store scores")
+        version = rubric_version(best_practices_data)
+        rows = flatten_scores(scores, rubric_categories(best_practices_data))
+        if not rows:
+            raise ScoreStoreError("Score payload contained no recognised categories")
+
+        with self._write_lock, self._session() as conn:
+            cur = conn.execute(
+                "INSERT INTO analyses (town_key, town, ordinance_hash, rubric_version, analyzed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (town_key, town.strip(), ordinance_hash, version, time.time()),
+            )
+            analysis_id = cur.lastrowid
+            conn.executemany(
+                "INSERT INTO scores (analysis_id, category, criterion, score) VALUES (?, ?, ?, ?)",
+                [(analysis_id, cat, crit, s) for cat, crit, s in rows],
+            )
+
+            # Retire this town's previous latest scores from the aggregates
+            previous = conn.execute(
+                "SELECT category, criterion, score FROM latest_scores "
+                "WHERE town_key = ? AND rubric_version = ?",
+                (town_key, version),
+            ).fetchall()
+            for old in previous:
+                self._bump_aggregate(conn, version, old["category"], old["criterion"], old["score"], -1)
+            conn.execute(
+                "DELETE FROM latest_scores WHERE town_key = ? AND rubric_version = ?",
+                (town_key, version),
+            )
+
+            conn.executemany(
+                "INSERT INTO latest_scores "
+                "(town_key, rubric_version, category, criterion, score, analysis_id) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(town_key, version, cat, crit, s, analysis_id) for cat, crit, s in rows],
+            )
+            for cat, crit, s in rows:
+                self._bump_aggregate(conn, version, cat, crit, s, +1)
+        return analysis_id
+
+    def category_stats(self, version: str, category: Optional[str] = None,
+                       criterion: str = "") -> List[Dict]:
+        """Count / mean / stddev / min / max per category (all categories if `category` is None)."""
+        if not os.path.exists(self.db_path):
+            return []
+        query = "SELECT * FROM aggregates WHERE rubric_version = ? AND n > 0"
+        params: list = [version]
+        if category is not None:
+            query += " AND category = ? AND criterion = ?"
+            params += [category, criterion]
+        else:
+            query += " AND criterion = ''"
+        stats = []
+        with self._session() as conn:
+            for agg in conn.execute(query + " ORDER BY category", params).fetchall():
+                n = agg["n"]
+                mean = agg["total"] / n
+                bounds = conn.execute(
+                    "SELECT MIN(score) AS lo, MAX(score) AS hi FROM latest_scores "
+                    "WHERE rubric_version = ? AND category = ? AND criterion = ?",
+                    (version, agg["category"], agg["criterion"]),
+                ).fetchone()
+                stats.append({
+                    'category': agg["category"],
+                    'criterion': agg["criterion"] or None,
+                    'count': n,
+                    'mean': round(mean, 2),
+                    'stddev': round(math.sqrt(max(agg["total_sq"] / n - mean * mean, 0.0)), 2),
+                    'min': bounds["lo"],
+                    'max': bounds["hi"],
+                })
+        return stats
+
+    def rank(self, version: str, category: str, criterion: str = "",
+             min_score: Optional[float] = None, max_score: Optional[float] = None,
+             order: str = "desc", limit: int = 50, offset: int = 0) -> List[Dict]:
+        """Towns ordered by their latest score in one category / criterion."""
+        if order not in ("asc", "desc"):
+            raise ScoreStoreError("order must be 'asc' or 'desc'")
+        if not os.path.exists(self.db_path):
+            return []
+        query = (
+            "SELECT l.score, a.town, a.ordinance_hash, a.analyzed_at "
+            "FROM latest_scores l JOIN analyses a ON a.id = l.analysis_id "
+            "WHERE l.rubric_version = ? AND l.category = ? AND l.criterion = ?"
+        )
+        params: list = [version, category, criterion]
+        if min_score is not None:
+            query += " AND l.score >= ?"
+            params.append(min_score)
+        if max_score is not None:
+            query += " AND l.score <= ?"
+            params.append(max_score)
+        query += f" ORDER BY l.score {order.upper()}, a.town LIMIT ? OFFSET ?"
+        params += [limit, offset]
+        with self._session() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [
+            {
+                'rank': offset + i + 1,
+                'town': r["town"],
+                'score': r["score"],
+                'ordinance_hash': r["ordinance_hash"],
+                'analyzed_at': r["analyzed_at"],
+            }
+            for i, r in enumerate(rows)
+        ]